@@ -7,10 +7,11 @@ Data Model:
   work_sessions(
       id INTEGER PRIMARY KEY,
       task_name TEXT NOT NULL,
-      start_time TEXT NOT NULL,    -- UTC in ISO-8601
+      start_time INTEGER NOT NULL, -- UTC unix epoch seconds
       duration_seconds REAL NOT NULL,
       count INTEGER NOT NULL,
       price REAL NOT NULL,
+      earned REAL GENERATED ALWAYS AS (count * price) VIRTUAL,
       FOREIGN KEY (task_name) REFERENCES tasks(name)
   )
 
@@ -25,10 +26,10 @@ Core Behavior:
 Time Tracking:
   - We keep an in-memory "active session" if a task is active:
       * active_task
-      * current_session_start_utc (a datetime)
+      * current_session_start_epoch (wall-clock time.time() at session start)
       * current_session_elapsed (accumulated paused time)
       * paused (bool)
-      * timer_start_time (timestamp when last resumed)
+      * timer_start_time (time.monotonic() when last resumed)
   - Pausing/resuming just updates the in-memory time.
   - Switching tasks or incrementing finalizes the old session,
     then starts a brand new session in memory (if continuing).
@@ -42,38 +43,162 @@ Required Views:
   2) Daily summary (stats day ...)
   3) Monthly summary (stats month ...)
 """
+import re
 import sys
 import sqlite3
 import time
-from datetime import datetime, timedelta
-import pytz
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from prompt_toolkit import PromptSession
-from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.styles import Style
 from rich.console import Console
-from rich.table import Table
+# rich.table and prompt_toolkit are imported lazily where they are used,
+# keeping them off the startup path.
 
 # --------------------------------------------------
 # CONFIGURATION
 # --------------------------------------------------
 
 DB_NAME = "tasks.db"
-TIMEZONE = pytz.utc  # Adjust if you'd like to display local times differently
+_MIN_EXIT_SESSION_SECONDS = 1.0  # shorter sessions are dropped on exit
+_FLUSH_DELAY = 0.25  # max seconds a finalized session waits in memory
+
+# `stats` argument formats, compiled once
+_RE_DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_RE_MONTH = re.compile(r"^\d{4}-\d{2}$")
+_MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12
+}
+# Adjust (e.g. zoneinfo.ZoneInfo("Europe/Paris"); on Windows this also needs
+# `pip install tzdata`) to display local times differently.
+# The default is the stdlib's fixed UTC singleton, the cheapest tzinfo to use.
+TIMEZONE = timezone.utc
 console = Console()
 
 
+def _fixed_utc_offset(tz) -> Optional[int]:
+    """
+    Return tz's UTC offset in seconds if it never changes (e.g. UTC),
+    or None for zones with DST/historical transitions.
+    """
+    offset = tz.utcoffset(None)
+    return None if offset is None else int(offset.total_seconds())
+
+
+# When TIMEZONE has a fixed offset, SQLite can render local timestamps
+# itself, so the history view does no per-row datetime work in Python.
+_UTC_OFFSET = _fixed_utc_offset(TIMEZONE)
+
+# Per-task totals for a [start, end) UTC range, shared by the daily and
+# monthly summaries so SQLite's statement cache reuses the same plan.
+_SUMMARY_SQL = """
+    SELECT
+        task_name,
+        SUM(duration_seconds) AS total_duration,
+        SUM(count) AS total_count,
+        SUM(earned) AS total_earned,
+        CASE WHEN SUM(duration_seconds) > 0
+             THEN SUM(earned) * 3600.0 / SUM(duration_seconds)
+             ELSE 0 END AS hourly_rate
+    FROM work_sessions
+    WHERE start_time >= ? AND start_time < ?
+    GROUP BY task_name
+    ORDER BY task_name
+"""
+
+# Every statement is a module-level constant so the exact same text hits
+# sqlite3's per-connection prepared-statement cache on every call.
+# The price is read from tasks inside the INSERT itself, so finalizing
+# is one statement and always uses the stored price.
+_INSERT_SESSION_PRICED_SQL = """
+    INSERT INTO work_sessions (task_name, start_time, duration_seconds, count, price)
+    VALUES (?, ?, ?, ?, COALESCE((SELECT price FROM tasks WHERE name = ?), 0.0))
+"""
+_SELECT_PRICES_SQL = "SELECT name, price FROM tasks;"
+_UPSERT_PRICE_SQL = "INSERT OR REPLACE INTO tasks (name, price) VALUES (?, ?);"
+_DELETE_SESSION_SQL = "DELETE FROM work_sessions WHERE id = ?;"
+
+# work_sessions is aggregated once in a subquery; joining it directly
+# would rescan every session per task, as no index leads with task_name.
+_LIST_TASKS_SQL = """
+    SELECT tasks.name, tasks.price, last.last_used
+    FROM tasks
+    LEFT JOIN (
+        SELECT task_name, MAX(start_time) AS last_used
+        FROM work_sessions
+        GROUP BY task_name
+    ) AS last ON last.task_name = tasks.name
+    ORDER BY last.last_used ASC
+"""
+
+_DAILY_BREAKDOWN_SQL = """
+    SELECT
+        date(start_time, 'unixepoch', 'localtime') as day,
+        SUM(duration_seconds) as total_duration,
+        SUM(count) as total_count,
+        SUM(earned) as total_earned,
+        CASE WHEN SUM(duration_seconds) > 0
+             THEN SUM(earned) * 3600.0 / SUM(duration_seconds)
+             ELSE 0 END as hourly_rate
+    FROM work_sessions
+    WHERE start_time >= ? AND start_time < ?
+    GROUP BY date(start_time, 'unixepoch', 'localtime')
+    ORDER BY day
+"""
+
+# History queries; {start_col} is either the raw epoch or, for fixed-offset
+# zones, the SQLite-formatted local time (see fetch_all_sessions).
+_HISTORY_SQL = """
+    SELECT id, task_name, {start_col}, duration_seconds, count, price, earned
+    FROM work_sessions
+    ORDER BY start_time ASC, id ASC
+"""
+_HISTORY_LATEST_SQL = """
+    SELECT id, task_name, {start_col}, duration_seconds, count, price, earned
+    FROM (
+        SELECT id, task_name, start_time, duration_seconds, count, price, earned
+        FROM work_sessions
+        ORDER BY start_time DESC, id DESC
+        LIMIT ?
+    )
+    ORDER BY start_time ASC, id ASC
+"""
+_LOCAL_START_COL = "strftime('%Y-%m-%d %H:%M:%S', start_time + ?, 'unixepoch')"
+
+
 # --------------------------------------------------
 # DATABASE SETUP
 # --------------------------------------------------
 
-def init_db():
+@contextmanager
+def transaction(conn: sqlite3.Connection):
     """
-    Create or migrate the database schema.
+    Explicit BEGIN ... COMMIT around the block, ROLLBACK on error.
+    Connections are opened with isolation_level=None (autocommit),
+    so this is the only place transactions start.
     """
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
 
+
+def init_db(conn: sqlite3.Connection):
+    """
+    Create or migrate the database schema on the given connection,
+    in a single transaction.
+    """
+    with transaction(conn):
+        _create_schema(conn.cursor())
+
+
+def _create_schema(c: sqlite3.Cursor):
+    """
+    Create tables/indices and apply pending migrations (idempotent).
+    """
     # tasks table
     c.execute("""
     CREATE TABLE IF NOT EXISTS tasks (
@@ -82,21 +207,78 @@ def init_db():
     );
     """)
 
+    # Schema version 1: work_sessions.start_time moved from ISO-8601 TEXT
+    # to INTEGER epoch seconds. A TEXT column would coerce integers back
+    # to text, so an old table is rebuilt rather than updated in place.
+    user_version = c.execute("PRAGMA user_version;").fetchone()[0]
+    if user_version < 1:
+        columns = {row[1]: row[2] for row in c.execute("PRAGMA table_info(work_sessions);")}
+        if columns.get("start_time", "").upper() == "TEXT":
+            c.execute("ALTER TABLE work_sessions RENAME TO work_sessions_v0;")
+
     # work_sessions table without ON DELETE CASCADE
     c.execute("""
     CREATE TABLE IF NOT EXISTS work_sessions (
         id INTEGER PRIMARY KEY,
         task_name TEXT NOT NULL,
-        start_time TEXT NOT NULL,          -- UTC ISO-8601
+        start_time INTEGER NOT NULL,       -- UTC unix epoch seconds
         duration_seconds REAL NOT NULL,
         count INTEGER NOT NULL,
         price REAL NOT NULL,
+        earned REAL GENERATED ALWAYS AS (count * price) VIRTUAL,
         FOREIGN KEY (task_name) REFERENCES tasks(name)
     );
     """)
 
-    conn.commit()
-    conn.close()
+    if user_version < 1:
+        has_v0 = c.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'work_sessions_v0'
+        """).fetchone()
+        if has_v0:
+            c.execute("""
+                INSERT INTO work_sessions (id, task_name, start_time, duration_seconds, count, price)
+                SELECT id, task_name, CAST(strftime('%s', start_time) AS INTEGER),
+                       duration_seconds, count, price
+                FROM work_sessions_v0
+            """)
+            c.execute("DROP TABLE work_sessions_v0;")
+        c.execute("PRAGMA user_version = 1;")
+
+    # Schema version 2: earned = count * price as a virtual generated column
+    # (SQLite >= 3.31), so reports SUM(earned) instead of multiplying per row.
+    # Tables created above already have it; older ones get it added.
+    if user_version < 2:
+        columns = {row[1] for row in c.execute("PRAGMA table_xinfo(work_sessions);")}
+        if "earned" not in columns:
+            c.execute("""
+                ALTER TABLE work_sessions
+                ADD COLUMN earned REAL GENERATED ALWAYS AS (count * price) VIRTUAL
+            """)
+        c.execute("PRAGMA user_version = 2;")
+
+    # One covering index, led by start_time: history ordering, and the
+    # summaries and daily breakdown aggregate straight from it without
+    # touching the table.
+    # Schema version 3 dropped the narrow idx_ws_task_start; version 4 drops
+    # idx_ws_start (a prefix of the covering index) and the task-first
+    # covering index, which doubled the table's size again.
+    if user_version < 3:
+        c.execute("DROP INDEX IF EXISTS idx_ws_task_start;")
+        c.execute("PRAGMA user_version = 3;")
+    if user_version < 4:
+        c.execute("DROP INDEX IF EXISTS idx_ws_start;")
+        c.execute("DROP INDEX IF EXISTS idx_ws_task_cover;")
+        c.execute("PRAGMA user_version = 4;")
+    has_index = c.execute("""
+        SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_ws_start_cover'
+    """).fetchone()
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ws_start_cover
+        ON work_sessions(start_time, task_name, duration_seconds, count, price, earned);
+    """)
+    if not has_index:
+        # Gather statistics once so the planner picks up the new index.
+        c.execute("ANALYZE;")
 
 
 # --------------------------------------------------
@@ -109,12 +291,59 @@ def format_duration(seconds: float) -> str:
     """
     if seconds <= 0:
         return "0:00:00"
-    td = timedelta(seconds=round(seconds))
-    hours, remainder = divmod(int(td.total_seconds()), 3600)
+    hours, remainder = divmod(int(seconds + 0.5), 3600)
     minutes, sec = divmod(remainder, 60)
     return f"{hours}:{minutes:02d}:{sec:02d}"
 
 
+# --------------------------------------------------
+# HELPER: Report Tables
+# --------------------------------------------------
+
+# Column specs (header, style, justify) for every report table.
+_HISTORY_COLUMNS = (
+    ("ID", "yellow", "right"),
+    ("Start (Local)", "cyan", "left"),
+    ("Task", None, "left"),
+    ("Duration", None, "right"),
+    ("Count", None, "right"),
+    ("Price (€)", None, "right"),
+    ("Earned (€)", None, "right"),
+)
+_SUMMARY_COLUMNS = (
+    ("Task", "cyan", "left"),
+    ("Count", None, "right"),
+    ("Duration", None, "right"),
+    ("Earned (€)", None, "right"),
+    ("Hourly Rate (€ / hr)", None, "right"),
+)
+_BREAKDOWN_COLUMNS = (
+    ("Date", "cyan", "left"),
+    ("Duration", None, "right"),
+    ("Count", None, "right"),
+    ("Earned (€)", None, "right"),
+    ("Hourly Rate (€/hr)", None, "right"),
+)
+_TASK_LIST_COLUMNS = (
+    ("Name", "cyan", "left"),
+    ("Price (€)", None, "right"),
+    ("Last Used", None, "right"),
+)
+
+
+def make_table(title: str, columns, header_style: str = "bold magenta"):
+    """
+    Build an empty rich Table with the given (header, style, justify)
+    columns. rich.table is imported lazily so startup does not pay for it.
+    """
+    from rich.table import Table
+
+    table = Table(title=title, header_style=header_style)
+    for header, style, justify in columns:
+        table.add_column(header, style=style, justify=justify)
+    return table
+
+
 # --------------------------------------------------
 # TASK TRACKER
 # --------------------------------------------------
@@ -126,53 +355,107 @@ class TaskTracker:
     """
 
     def __init__(self, db_name=DB_NAME):
-        init_db()
-        self.conn = sqlite3.connect(db_name)
+        # One connection per process, in autocommit mode: writers open
+        # their own transactions via self.transaction().
+        self.conn = sqlite3.connect(db_name, isolation_level=None)
+        self._closed = False
         self.conn.execute("PRAGMA foreign_keys = ON")
+        # WAL + synchronous=NORMAL: a commit appends to the WAL without a
+        # full fsync, which is safe for this single-user workload.
+        # In-memory databases (tests, scratch runs) have no journal file.
+        if db_name != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        # Keep temp B-trees (GROUP BY/ORDER BY) in RAM, allow a 20 MB page
+        # cache and memory-map up to 256 MB so reports read from memory.
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA cache_size = -20000")
+        self.conn.execute("PRAGMA mmap_size = 268435456")
+        # Bound the work any ANALYZE (including PRAGMA optimize) may do.
+        self.conn.execute("PRAGMA analysis_limit = 1000")
+        init_db(self.conn)
+
+        # Task prices, read only by switch_task's existence check (sessions
+        # are priced in SQL). Filled on first get_task_price and kept current
+        # by set_task_price; None means "not loaded yet".
+        self._price_cache: Optional[dict[str, float]] = None
 
         # Active session tracking:
         self.active_task: Optional[str] = None
-        self.current_session_start_utc: Optional[datetime] = None
+        self.current_session_start_epoch: Optional[float] = None  # time.time() at start
         self.current_session_elapsed: float = 0.0  # accumulated paused time
         self.paused: bool = True
-        self.timer_start_time: float = 0.0  # last time we resumed
-
-    def __del__(self):
+        self.timer_start_time: float = 0.0  # time.monotonic() when we last resumed
+
+        # (active_task, prompt) for the paused/no-task prompt, which does not
+        # change between refreshes. Cleared on every state transition.
+        self._paused_prompt_cache: Optional[tuple] = None
+        # (active_task, fragments) for the fixed part of the running prompt;
+        # only the elapsed time is appended per redraw.
+        self._running_prompt_cache: Optional[tuple] = None
+        # Last rendered elapsed time, keyed by the whole second it shows.
+        self._last_elapsed_int: int = -1
+        self._last_elapsed_str: str = ""
+
+        # Finalized sessions not yet written, as _INSERT_SESSION_PRICED_SQL
+        # parameter tuples. Rapid increments share one transaction; they
+        # are written by _FLUSH_DELAY after the first one at the latest.
+        self._pending_sessions: list[tuple] = []
+        self._pending_deadline: float = 0.0  # time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        Refresh planner statistics that have gone stale (PRAGMA optimize),
+        checkpoint the WAL back into the database and truncate it, then
+        close the connection, so the next start does not replay a large
+        -wal file. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self.flush_pending()
+        self._closed = True
+        self.conn.execute("PRAGMA optimize;")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
         self.conn.close()
 
-    def execute(self, query, params=()):
-        c = self.conn.cursor()
-        c.execute(query, params)
-        self.conn.commit()
-        return c
+    def transaction(self):
+        """
+        Context manager wrapping the block in one BEGIN ... COMMIT.
+        Writers use it as their transaction boundary, so each user action
+        costs at most one commit; reads run directly on self.conn.
+        """
+        return transaction(self.conn)
 
     # -------------------------
     # Tasks
     # -------------------------
     def set_task_price(self, name: str, price: float):
-        self.execute("""
-            INSERT OR REPLACE INTO tasks (name, price) VALUES (?, ?)
-        """, (name, price))
+        # Pending sessions must be priced before the change.
+        self.flush_pending()
+        with self.transaction():
+            self.conn.execute(_UPSERT_PRICE_SQL, (name, price))
+        if self._price_cache is not None:
+            self._price_cache[name] = price
         console.print(f"[green]Task '{name}' price set to €{price:.2f}[/]")
 
     def get_task_price(self, name: str) -> Optional[float]:
-        c = self.execute("SELECT price FROM tasks WHERE name=?;", (name,))
-        row = c.fetchone()
-        return row[0] if row else None
+        if self._price_cache is None:
+            self._price_cache = dict(self.conn.execute(_SELECT_PRICES_SQL))
+        return self._price_cache.get(name)
 
     def list_tasks(self):
         """
         List all tasks with their price and last used date,
         sorted by last used date (recent last).
         """
-        c = self.execute("""
-            SELECT tasks.name, tasks.price, MAX(work_sessions.start_time) as last_used
-            FROM tasks
-            LEFT JOIN work_sessions ON tasks.name = work_sessions.task_name
-            GROUP BY tasks.name
-            ORDER BY last_used ASC
-        """)
-        return c.fetchall()
+        self.flush_pending()
+        return self.conn.execute(_LIST_TASKS_SQL).fetchall()
 
     # -------------------------
     # Active Session Management
@@ -184,62 +467,96 @@ class TaskTracker:
         If paused=False, we set timer_start_time so we can accumulate real-time.
         """
         self.active_task = task_name
-        self.current_session_start_utc = datetime.utcnow()
+        self.current_session_start_epoch = time.time()
         self.current_session_elapsed = 0.0
         self.paused = True
         self.timer_start_time = 0.0
+        self._paused_prompt_cache = None
 
     def get_current_elapsed(self) -> float:
         """
         Return how much time has been accumulated in the current active session (in seconds).
         """
-        if not self.active_task or not self.current_session_start_utc:
+        if not self.active_task or self.current_session_start_epoch is None:
             return 0.0
         elapsed = self.current_session_elapsed
         if not self.paused:
-            elapsed += (time.time() - self.timer_start_time)
+            elapsed += (time.monotonic() - self.timer_start_time)
         return elapsed
 
+    def get_current_elapsed_str(self) -> str:
+        """
+        Return format_duration(get_current_elapsed()), only re-formatting
+        when the displayed whole second actually changes.
+        """
+        seconds = int(self.get_current_elapsed() + 0.5)
+        if seconds != self._last_elapsed_int:
+            self._last_elapsed_int = seconds
+            self._last_elapsed_str = format_duration(seconds)
+        return self._last_elapsed_str
+
     def finalize_session(self, count: int = 1):
         """
-        Finalize the current in-memory session by inserting a row
-        into work_sessions. Then reset active_task to None.
+        Finalize the current in-memory session by queueing a row for
+        work_sessions (see flush_pending). Then reset active_task to None.
         If there is no active task, do nothing.
         Returns whether the old session was paused or not,
         so we can preserve that state if we want to start a new session.
         """
-        if not self.active_task or not self.current_session_start_utc:
+        if not self.active_task or self.current_session_start_epoch is None:
             return self.paused  # No active session to finalize
 
         # Calculate final duration
         final_duration = self.get_current_elapsed()
 
-        # Grab current price
-        price_now = self.get_task_price(self.active_task) or 0.0
-
-        # Insert session
-        self.execute("""
-            INSERT INTO work_sessions (task_name, start_time, duration_seconds, count, price)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
+        # Queue session (price is looked up by the INSERT itself)
+        if not self._pending_sessions:
+            self._pending_deadline = time.monotonic() + _FLUSH_DELAY
+        self._pending_sessions.append((
             self.active_task,
-            self.current_session_start_utc.isoformat(),  # store as UTC ISO string
+            int(self.current_session_start_epoch),  # store as UTC epoch seconds
             final_duration,
             count,
-            price_now
+            self.active_task
         ))
+        if time.monotonic() >= self._pending_deadline:
+            self.flush_pending()
 
         old_paused = self.paused
 
         # Reset the active session entirely
         self.active_task = None
-        self.current_session_start_utc = None
+        self.current_session_start_epoch = None
         self.current_session_elapsed = 0.0
         self.timer_start_time = 0.0
         self.paused = True
+        self._paused_prompt_cache = None
 
         return old_paused
 
+    def flush_pending(self):
+        """
+        Write all queued sessions with one executemany in one transaction.
+        Called when the flush deadline passes, and before anything that
+        reads work_sessions or changes prices.
+        """
+        if not self._pending_sessions:
+            return
+        # Cleared only after COMMIT, so a failed write (e.g. "database is
+        # locked") leaves the sessions queued for the next flush.
+        with self.transaction():
+            self.conn.executemany(_INSERT_SESSION_PRICED_SQL, self._pending_sessions)
+        self._pending_sessions = []
+
+    def flush_delay(self) -> Optional[float]:
+        """
+        Seconds until queued sessions are due to be written,
+        or None if nothing is queued.
+        """
+        if not self._pending_sessions:
+            return None
+        return max(0.0, self._pending_deadline - time.monotonic())
+
     # -------------------------
     # Commands: start/pause/switch/increment/exit
     # -------------------------
@@ -253,15 +570,16 @@ class TaskTracker:
             return
 
         # If paused and the last start time was more than 30 minutes ago, reset
-        if (self.paused and self.current_session_start_utc and
-            (datetime.utcnow() - self.current_session_start_utc).total_seconds() > 1800):
+        if (self.paused and self.current_session_start_epoch is not None and
+            time.time() - self.current_session_start_epoch > 1800):
             console.print("[yellow]Session was paused for over 30 minutes - resetting timer.[/]")
             self.start_session_for_task(self.active_task)
 
         # Resume tracking
         self.paused = False
-        self.timer_start_time = time.time()
-        console.print("[green]Session resumed/started[/]")
+        self.timer_start_time = time.monotonic()
+        self._paused_prompt_cache = None
+        console.print("Session resumed/started", style="green", markup=False)
 
     def reset_current_session(self):
         """
@@ -284,9 +602,10 @@ class TaskTracker:
             return
 
         # Accumulate the elapsed time
-        self.current_session_elapsed += (time.time() - self.timer_start_time)
+        self.current_session_elapsed += (time.monotonic() - self.timer_start_time)
         self.paused = True
-        console.print("[green]Session paused[/]")
+        self._paused_prompt_cache = None
+        console.print("Session paused", style="green", markup=False)
 
     def switch_task(self, new_task: str):
         """
@@ -306,13 +625,14 @@ class TaskTracker:
         # If we were running before, continue running
         if not old_paused:
             self.paused = False
-            self.timer_start_time = time.time()
+            self.timer_start_time = time.monotonic()
 
-        console.print(f"[cyan]Switched active task to '{new_task}'[/]")
+        console.print(f"Switched active task to '{new_task}'", style="cyan", markup=False)
 
-    def increment_current_task(self, n: int = 1, _placeholder=None):
+    def increment_current_task(self, n: int = 1):
         """
-        Overwrite of the above method to fix scoping:
+        Finalize the current session with count=n, then immediately
+        start a new session for the same task, preserving paused/running.
         """
         if not self.active_task:
             console.print("[red]No active task to increment.[/]")
@@ -328,60 +648,65 @@ class TaskTracker:
         if not old_paused:
             # if we were running, keep running
             self.paused = False
-            self.timer_start_time = time.time()
+            self.timer_start_time = time.monotonic()
 
-        console.print(f"[green]Incremented '{current_task}' by {n}[/]")
+        console.print(f"Incremented '{current_task}' by {n}", style="green", markup=False)
 
     def handle_exit(self):
+        """
+        Finalize the running session with count=0 so its time is recorded
+        before the connection closes. Sessions shorter than
+        _MIN_EXIT_SESSION_SECONDS (e.g. quitting right after an increment)
+        are dropped instead of leaving an empty row.
+        """
+        if self.active_task and self.get_current_elapsed() >= _MIN_EXIT_SESSION_SECONDS:
+            self.finalize_session(count=0)
         console.print("[bold]Exiting...[/bold]")
 
     # ------------------------------------------------
     # Reporting: Chronological, Daily, Monthly
     # ------------------------------------------------
 
-    def fetch_all_sessions(self):
+    def fetch_all_sessions(self, limit: Optional[int] = None, local_time: bool = False):
         """
-        Return all sessions as a list of tuples:
-         (id, task_name, start_time(iso), duration_seconds, count, price)
-        ordered by start_time ASC.
+        Return a cursor over sessions as tuples:
+         (id, task_name, start_time(epoch), duration_seconds, count,
+          price, earned)
+        ordered by start_time ASC. Rows are streamed, not materialized.
+        If limit is given, only the latest `limit` sessions are returned
+        (SQLite picks them DESC with LIMIT, then re-orders them ASC).
+        If local_time is True (only valid when _UTC_OFFSET is not None),
+        start_time is returned as a "YYYY-MM-DD HH:MM:SS" local string
+        formatted by SQLite.
         """
-        c = self.execute("""
-            SELECT id, task_name, start_time, duration_seconds, count, price
-            FROM work_sessions
-            ORDER BY start_time ASC
-        """)
-        return c.fetchall()
+        self.flush_pending()
+        if local_time:
+            start_col = _LOCAL_START_COL
+            params = (_UTC_OFFSET,)
+        else:
+            start_col = "start_time"
+            params = ()
+
+        if limit is not None and limit > 0:
+            sql = _HISTORY_LATEST_SQL.format(start_col=start_col)
+            return self.conn.execute(sql, params + (limit,))
+
+        return self.conn.execute(_HISTORY_SQL.format(start_col=start_col), params)
 
     def show_chronological_view(self, limit: Optional[int] = None):
         """
         Print a chronological listing of sessions (by start_time ascending).
         If limit is given, we show only the most recent N by date descending.
         """
-        rows = self.fetch_all_sessions()
-        if not rows:
-            console.print("[magenta]No sessions found.[/]")
-            return
+        table = make_table("Chronological Sessions", _HISTORY_COLUMNS)
 
-        # If limit is specified, show the *latest* N, so we might need to sort desc and slice
-        if limit is not None and limit > 0:
-            rows = sorted(rows, key=lambda r: r[2], reverse=True)[:limit]
-            rows = sorted(rows, key=lambda r: r[2])  # re-sort ascending for display
-
-        table = Table(title="Chronological Sessions", header_style="bold magenta")
-        table.add_column("ID", style="yellow", justify="right")
-        table.add_column("Start (Local)", style="cyan")
-        table.add_column("Task")
-        table.add_column("Duration", justify="right")
-        table.add_column("Count", justify="right")
-        table.add_column("Price (€)", justify="right")
-        table.add_column("Earned (€)", justify="right")
-
-        for (sid, task, start_iso, dur, ccount, price) in rows:
-            # Convert start_iso (UTC) -> local time
-            utc_dt = datetime.fromisoformat(start_iso)
-            local_dt = pytz.utc.localize(utc_dt).astimezone(TIMEZONE)
-            local_str = local_dt.strftime("%Y-%m-%d %H:%M:%S")
-            earned = ccount * price
+        sql_local_time = _UTC_OFFSET is not None
+        for (sid, task, start, dur, ccount, price, earned) in self.fetch_all_sessions(limit, sql_local_time):
+            if sql_local_time:
+                local_str = start
+            else:
+                # Convert start (UTC epoch) -> local time
+                local_str = datetime.fromtimestamp(start, tz=TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
             table.add_row(
                 str(sid),
                 local_str,
@@ -392,68 +717,71 @@ class TaskTracker:
                 f"{earned:.2f}"
             )
 
+        if not table.row_count:
+            console.print("[magenta]No sessions found.[/]")
+            return
+
         console.print(table)
 
     def _get_date_range_utc(self, date_str: Optional[str], is_monthly: bool) -> tuple:
-        """Get UTC datetime range for daily or monthly summaries."""
+        """Get UTC epoch-second range [start, end) for daily or monthly summaries."""
         if date_str is None:
             now_local = datetime.now(TIMEZONE)
             date_str = now_local.strftime("%Y-%m" if is_monthly else "%Y-%m-%d")
 
         if is_monthly:
             year, month = map(int, date_str.split("-"))
-            start = TIMEZONE.localize(datetime(year, month, 1))
+            start = datetime(year, month, 1, tzinfo=TIMEZONE)
             if month == 12:
-                end = TIMEZONE.localize(datetime(year + 1, 1, 1))
+                end = datetime(year + 1, 1, 1, tzinfo=TIMEZONE)
             else:
-                end = TIMEZONE.localize(datetime(year, month + 1, 1))
+                end = datetime(year, month + 1, 1, tzinfo=TIMEZONE)
         else:
-            start = TIMEZONE.localize(datetime.strptime(date_str, "%Y-%m-%d"))
+            start = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=TIMEZONE)
             end = start + timedelta(days=1)
 
-        return start.astimezone(pytz.utc), end.astimezone(pytz.utc)
-
-    def _generate_summary_table(self, rows, period_str: str, is_monthly: bool) -> None:
-        """Generate and display summary table for daily or monthly data."""
-        if not rows:
-            period_type = "month" if is_monthly else "day"
-            console.print(f"[bold magenta]No sessions found for {period_type} {period_str}[/]")
-            return
+        return int(start.timestamp()), int(end.timestamp())
 
-        aggregate = {}
-        for (task, dur, cnt, p, st) in rows:
-            if task not in aggregate:
-                aggregate[task] = {'count': 0, 'duration': 0.0, 'earned': 0.0}
-            aggregate[task]['count'] += cnt
-            aggregate[task]['duration'] += dur
-            aggregate[task]['earned'] += (cnt * p)
+    def _fetch_aggregate(self, start_utc: int, end_utc: int) -> sqlite3.Cursor:
+        """
+        Return a cursor over per-task totals for sessions starting in
+        [start_utc, end_utc), aggregated by SQLite:
+         (task_name, total_duration, total_count, total_earned, hourly_rate)
+        ordered by task_name. Rows are streamed, not materialized.
+        """
+        self.flush_pending()
+        return self.conn.execute(_SUMMARY_SQL, (start_utc, end_utc))
 
+    def _generate_summary_table(self, rows, period_str: str, is_monthly: bool) -> bool:
+        """
+        Generate and display summary table for daily or monthly data.
+        rows are already aggregated per task by SQLite:
+         (task_name, total_duration, total_count, total_earned, hourly_rate)
+        and are consumed in a single pass. Returns False if there were none.
+        """
         period_type = "Monthly" if is_monthly else "Daily"
-        table = Table(title=f"{period_type} Summary for {period_str}", header_style="bold magenta")
-        table.add_column("Task", style="cyan")
-        table.add_column("Count", justify="right")
-        table.add_column("Duration", justify="right")
-        table.add_column("Earned (€)", justify="right")
-        table.add_column("Hourly Rate (€ / hr)", justify="right")
+        table = make_table(f"{period_type} Summary for {period_str}", _SUMMARY_COLUMNS)
 
-        total_count = total_time = total_earned = 0.0
-
-        for task in sorted(aggregate.keys()):
-            data = aggregate[task]
-            hours = data['duration'] / 3600 if data['duration'] > 0 else 0
-            hourly_rate = data['earned'] / hours if hours > 0 else 0
+        total_count = 0
+        total_time = total_earned = 0.0
 
+        for (task, duration, count, earned, hourly_rate) in rows:
             table.add_row(
                 task,
-                str(data['count']),
-                format_duration(data['duration']),
-                f"{data['earned']:.2f}",
+                str(count),
+                format_duration(duration),
+                f"{earned:.2f}",
                 f"{hourly_rate:.2f}"
             )
 
-            total_count += data['count']
-            total_time += data['duration']
-            total_earned += data['earned']
+            total_count += count
+            total_time += duration
+            total_earned += earned
+
+        if not table.row_count:
+            period_type = "month" if is_monthly else "day"
+            console.print(f"[bold magenta]No sessions found for {period_type} {period_str}[/]")
+            return False
 
         tot_hours = total_time / 3600 if total_time > 0 else 0
         tot_hrate = total_earned / tot_hours if tot_hours > 0 else 0
@@ -466,6 +794,7 @@ class TaskTracker:
         )
 
         console.print(table)
+        return True
 
     def show_daily_summary(self, day_str: Optional[str] = None):
         """
@@ -474,19 +803,11 @@ class TaskTracker:
         Aggregation = sum duration, sum count, sum earned by task.
         """
         start_utc, end_utc = self._get_date_range_utc(day_str, False)
-        rows = self.execute("""
-            SELECT task_name, duration_seconds, count, price, start_time
-            FROM work_sessions
-            WHERE start_time >= ? AND start_time < ?
-            ORDER BY task_name
-        """, (start_utc.isoformat(), end_utc.isoformat())).fetchall()
+        rows = self._fetch_aggregate(start_utc, end_utc)
 
         self._generate_summary_table(rows, day_str or datetime.now(TIMEZONE).strftime("%Y-%m-%d"), False)
 
     def parse_stats_arg(self, arg: str) -> tuple[bool, str]:
-        import re
-        from datetime import datetime, timedelta
-
         arg_lower = arg.lower().strip()
 
         # special keywords
@@ -498,18 +819,14 @@ class TaskTracker:
             return (False, today.strftime("%Y-%m-%d"))
 
         # explicit formats
-        if re.match(r"^\d{4}-\d{2}-\d{2}$", arg):
+        if _RE_DAY.match(arg):
             return (False, arg)  # daily
-        if re.match(r"^\d{4}-\d{2}$", arg):
+        if _RE_MONTH.match(arg):
             return (True, arg)  # monthly
 
         # month name? use most recent past occurrence
-        months = {
-            "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
-            "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12
-        }
-        if arg_lower in months:
-            target_month = months[arg_lower]
+        target_month = _MONTHS.get(arg_lower)
+        if target_month is not None:
             now = datetime.now(TIMEZONE)
             year = now.year if now.month > target_month else now.year - 1
             return (True, f"{year}-{target_month:02d}")
@@ -524,44 +841,23 @@ class TaskTracker:
         """
         start_utc, end_utc = self._get_date_range_utc(ym_str, True)
 
-        # Get all sessions for the month
-        rows = self.execute("""
-            SELECT task_name, duration_seconds, count, price, start_time
-            FROM work_sessions
-            WHERE start_time >= ? AND start_time < ?
-            ORDER BY task_name
-        """, (start_utc.isoformat(), end_utc.isoformat())).fetchall()
+        # Get per-task totals for the month
+        rows = self._fetch_aggregate(start_utc, end_utc)
 
         # Show the monthly summary table first
-        self._generate_summary_table(rows, ym_str or datetime.now(TIMEZONE).strftime("%Y-%m"), True)
+        has_rows = self._generate_summary_table(
+            rows, ym_str or datetime.now(TIMEZONE).strftime("%Y-%m"), True
+        )
 
         # Now create daily breakdown
-        if rows:
+        if has_rows:
             # Get daily totals
-            daily_data = self.execute("""
-                SELECT
-                    date(start_time, 'localtime') as day,
-                    SUM(duration_seconds) as total_duration,
-                    SUM(count) as total_count,
-                    SUM(count * price) as total_earned
-                FROM work_sessions
-                WHERE start_time >= ? AND start_time < ?
-                GROUP BY date(start_time, 'localtime')
-                ORDER BY day
-            """, (start_utc.isoformat(), end_utc.isoformat())).fetchall()
+            daily_data = self.conn.execute(_DAILY_BREAKDOWN_SQL, (start_utc, end_utc))
 
             # Create daily breakdown table
-            table = Table(title="Daily Breakdown", header_style="bold magenta")
-            table.add_column("Date", style="cyan")
-            table.add_column("Duration", justify="right")
-            table.add_column("Count", justify="right")
-            table.add_column("Earned (€)", justify="right")
-            table.add_column("Hourly Rate (€/hr)", justify="right")
-
-            for (day, duration, count, earned) in daily_data:
-                hours = duration / 3600 if duration > 0 else 0
-                hourly_rate = earned / hours if hours > 0 else 0
+            table = make_table("Daily Breakdown", _BREAKDOWN_COLUMNS)
 
+            for (day, duration, count, earned, hourly_rate) in daily_data:
                 table.add_row(
                     day,
                     format_duration(duration),
@@ -573,7 +869,6 @@ class TaskTracker:
             console.print(table)
 
 
-
     # -------------------------
     # Removal Methods
     # -------------------------
@@ -582,76 +877,23 @@ class TaskTracker:
         """
         Remove a work session by its ID.
         """
-        c = self.execute("SELECT * FROM work_sessions WHERE id = ?;", (session_id,))
-        session = c.fetchone()
-        if not session:
+        self.flush_pending()
+        with self.transaction():
+            c = self.conn.execute(_DELETE_SESSION_SQL, (session_id,))
+        if c.rowcount == 0:
             console.print(f"[red]No work session found with ID {session_id}.[/]")
             return
 
-        self.execute("DELETE FROM work_sessions WHERE id = ?;", (session_id,))
         console.print(f"[green]Work session with ID {session_id} has been removed.[/]")
 
 
 # --------------------------------------------------
-# MAIN CLI
+# COMMAND HANDLERS
 # --------------------------------------------------
 
-def main():
-    tracker = TaskTracker()
-    style = Style.from_dict({'prompt': 'ansicyan bold'})
 
-    def get_prompt_text():
-        """
-        Dynamically build the prompt label showing:
-          - active_task
-          - if paused vs running
-          - current elapsed time
-        """
-        if tracker.active_task:
-            elapsed = tracker.get_current_elapsed()
-            if tracker.paused:
-                label = f"[<red>■</red> {tracker.active_task}]"
-            else:
-                hhmmss = format_duration(elapsed)
-                label = f"[<green>●</green> {tracker.active_task} {hhmmss}]"
-        else:
-            label = "[<red>■</red> no-task]"
-        return HTML(f"<b>{label}</b> ➜ ")
-
-    session = PromptSession()
-
-    while True:
-        try:
-            command_line = session.prompt(
-                get_prompt_text,
-                style=style,
-                refresh_interval=1.0 if (tracker.active_task and not tracker.paused) else None
-            ).strip()
-        except (KeyboardInterrupt, EOFError):
-            tracker.handle_exit()
-            break
-
-        if not command_line:
-            # ENTER with no command => increment by 1
-            tracker.increment_current_task(1)
-            continue
-
-        parts = command_line.split()
-        cmd = parts[0].lower()
-        args = parts[1:]
-
-        # If the entire command is a number => increment
-        if cmd.isdigit():
-            n = int(cmd)
-            tracker.increment_current_task(n)
-            continue
-
-        if cmd in ("exit", "quit"):
-            tracker.handle_exit()
-            break
-
-        elif cmd == "help":
-            console.print("""
+def _cmd_help(tracker, args):
+    console.print("""
 [bold]Commands:[/bold]
   [cyan]switch <task>[/cyan]
       Switch to a different task. Finalizes the old session (if any).
@@ -681,100 +923,234 @@ def main():
       Exit the program.
 
 [dim]Press ENTER with no command to increment the active task by 1.[/dim]
-            """)
-            continue
+        """)
 
-        elif cmd in ("start", "s"):
-            tracker.start()
 
-        elif cmd in ("pause", "p"):
-            tracker.pause()
+def _cmd_switch(tracker, args):
+    if len(args) < 1:
+        console.print("[red]Usage: switch <task_name>[/]")
+        return
+    tracker.switch_task(args[0])
+
+
+def _cmd_set_price(tracker, args):
+    if len(args) < 2:
+        console.print("[red]Usage: set-price <task> <price>[/]")
+        return
+    tname = args[0]
+    try:
+        pval = float(args[1])
+    except ValueError:
+        console.print("[red]Invalid price. Must be a number.[/]")
+        return
+    tracker.set_task_price(tname, pval)
+
+
+def _cmd_list(tracker, args):
+    tasks = tracker.list_tasks()
+    if not tasks:
+        console.print("[yellow]No tasks found.[/]")
+        return
+    table = make_table("Known Tasks (Sorted by Last Used Date)", _TASK_LIST_COLUMNS, "bold blue")
+    for (tn, pr, last_used) in tasks:
+        if last_used:
+            # Convert last_used (UTC epoch) -> local time
+            local_dt = datetime.fromtimestamp(last_used, tz=TIMEZONE)
+            local_str = local_dt.strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            local_str = "Never"
+        table.add_row(tn, f"{pr:.2f}", local_str)
+    console.print(table)
 
-        elif cmd == "switch":
-            if len(args) < 1:
-                console.print("[red]Usage: switch <task_name>[/]")
-                continue
-            tracker.switch_task(args[0])
 
-        elif cmd == "set-price":
-            if len(args) < 2:
-                console.print("[red]Usage: set-price <task> <price>[/]")
-                continue
-            tname = args[0]
-            try:
-                pval = float(args[1])
-            except ValueError:
-                console.print("[red]Invalid price. Must be a number.[/]")
-                continue
-            tracker.set_task_price(tname, pval)
+def _cmd_status(tracker, args):
+    # Show today's daily summary
+    tracker.show_daily_summary(None)
 
-        elif cmd == "list":
-            tasks = tracker.list_tasks()
-            if not tasks:
-                console.print("[yellow]No tasks found.[/]")
-                continue
-            table = Table(title="Known Tasks (Sorted by Last Used Date)", header_style="bold blue")
-            table.add_column("Name", style="cyan")
-            table.add_column("Price (€)", justify="right")
-            table.add_column("Last Used", justify="right")
-            for (tn, pr, last_used) in tasks:
-                if last_used:
-                    # Convert start_iso (UTC) -> local time
-                    utc_dt = datetime.fromisoformat(last_used)
-                    local_dt = pytz.utc.localize(utc_dt).astimezone(TIMEZONE)
-                    local_str = local_dt.strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    local_str = "Never"
-                table.add_row(tn, f"{pr:.2f}", local_str)
-            console.print(table)
 
-        elif cmd == "status":
-            # Show today's daily summary
-            tracker.show_daily_summary(None)
+def _cmd_stats(tracker, args):
+    if not args:
+        tracker.show_daily_summary(None)
+        tracker.show_monthly_summary(None)
+        return
+    try:
+        is_monthly, date_str = tracker.parse_stats_arg(args[0])
+    except Exception:
+        console.print("[red]Usage: stats [YYYY-MM-DD|YYYY-MM|month|yesterday][/]")
+        return
 
-        elif cmd == "stats":
-            if not args:
-                tracker.show_daily_summary(None)
-                tracker.show_monthly_summary(None)
-                continue
-            try:
-                is_monthly, date_str = tracker.parse_stats_arg(args[0])
-            except Exception:
-                console.print("[red]Usage: stats [YYYY-MM-DD|YYYY-MM|month|yesterday][/]")
-                continue
+    if is_monthly:
+        tracker.show_monthly_summary(date_str)
+    else:
+        tracker.show_daily_summary(date_str)
 
-            if is_monthly:
-                tracker.show_monthly_summary(date_str)
+
+def _cmd_history(tracker, args):
+    limit = None
+    if len(args) == 1:
+        try:
+            limit = int(args[0])
+        except ValueError:
+            console.print("[red]Invalid limit. Must be an integer.[/]")
+    tracker.show_chronological_view(limit)
+
+
+def _cmd_rm(tracker, args):
+    if len(args) != 1:
+        console.print("[red]Usage: rm <session_id>[/]")
+        return
+    target = args[0]
+    if target.isdigit():
+        # Remove work session by ID
+        session_id = int(target)
+        tracker.remove_session_by_id(session_id)
+    else:
+        console.print("[red]Invalid argument. 'rm' command only accepts work session IDs (numbers).[/]")
+
+
+# Command name (and aliases) -> handler(tracker, args); one dict lookup
+# per command.
+_DISPATCH = {
+    "help": _cmd_help,
+    "start": lambda tracker, args: tracker.start(),
+    "s": lambda tracker, args: tracker.start(),
+    "pause": lambda tracker, args: tracker.pause(),
+    "p": lambda tracker, args: tracker.pause(),
+    "switch": _cmd_switch,
+    "set-price": _cmd_set_price,
+    "list": _cmd_list,
+    "status": _cmd_status,
+    "stats": _cmd_stats,
+    "history": _cmd_history,
+    "rm": _cmd_rm,
+    "rst": lambda tracker, args: tracker.reset_current_session(),
+    "reset": lambda tracker, args: tracker.reset_current_session(),
+}
+
+
+# --------------------------------------------------
+# MAIN CLI
+# --------------------------------------------------
+
+# Prompt label templates (prompt_toolkit HTML). Task names are escaped
+# before being substituted in.
+_PROMPT_RUNNING_PREFIX = "<b>[<green>●</green> {task} </b>"
+_PROMPT_PAUSED = "<b>[<red>■</red> {task}]</b> ➜ "
+_PROMPT_NO_TASK = "<b>[<red>■</red> no-task]</b> ➜ "
+
+
+def main():
+    import asyncio
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import HTML, FormattedText, to_formatted_text
+    from prompt_toolkit.formatted_text.html import html_escape
+    from prompt_toolkit.styles import Style
+
+    tracker = TaskTracker()
+    style = Style.from_dict({'prompt': 'ansicyan bold'})
+
+    def get_prompt_text():
+        """
+        Dynamically build the prompt label showing:
+          - active_task
+          - if paused vs running
+          - current elapsed time
+        Only the running label changes between refreshes; the paused
+        and no-task labels are built once and cached on the tracker.
+        """
+        if tracker.active_task and not tracker.paused:
+            # The task part is parsed once per task; each redraw only adds
+            # the elapsed-time fragment, styled like the bold prefix.
+            cached = tracker._running_prompt_cache
+            if cached is None or cached[0] != tracker.active_task:
+                prefix = HTML(_PROMPT_RUNNING_PREFIX.format(task=html_escape(tracker.active_task)))
+                cached = (tracker.active_task, list(to_formatted_text(prefix)))
+                tracker._running_prompt_cache = cached
+            return FormattedText(cached[1] + [
+                ("class:b", tracker.get_current_elapsed_str() + "]"),
+                ("", " ➜ "),
+            ])
+
+        cached = tracker._paused_prompt_cache
+        if cached is None or cached[0] != tracker.active_task:
+            if tracker.active_task:
+                prompt = HTML(_PROMPT_PAUSED.format(task=html_escape(tracker.active_task)))
             else:
-                tracker.show_daily_summary(date_str)
-
-        elif cmd == "history":
-            limit = None
-            if len(args) == 1:
-                try:
-                    limit = int(args[0])
-                except ValueError:
-                    console.print("[red]Invalid limit. Must be an integer.[/]")
-            tracker.show_chronological_view(limit)
-
-        elif cmd == "rm":
-            if len(args) != 1:
-                console.print("[red]Usage: rm <session_id>[/]")
+                prompt = HTML(_PROMPT_NO_TASK)
+            cached = (tracker.active_task, prompt)
+            tracker._paused_prompt_cache = cached
+        return cached[1]
+
+    async def redraw_on_second_change():
+        """
+        Redraw the prompt exactly when the displayed H:MM:SS changes.
+        format_duration rounds, so that happens at each half-second mark.
+        """
+        while True:
+            await asyncio.sleep(1 - (tracker.get_current_elapsed() + 0.5) % 1)
+            session.app.invalidate()
+
+    async def flush_when_due(delay):
+        """
+        Write queued sessions once their deadline passes while the
+        prompt is idle waiting for input.
+        """
+        await asyncio.sleep(delay)
+        tracker.flush_pending()
+
+    def start_background_tasks():
+        """
+        Only a running timer needs redraws; paused/no-task prompts never
+        wake up. Queued sessions get a one-shot flush at their deadline.
+        The tasks are owned by the prompt's Application, so they are
+        cancelled as soon as the prompt returns.
+        """
+        if tracker.active_task and not tracker.paused:
+            session.app.create_background_task(redraw_on_second_change())
+        delay = tracker.flush_delay()
+        if delay is not None:
+            session.app.create_background_task(flush_when_due(delay))
+
+    # The tracker closes its connection when the loop ends, however it ends.
+    with tracker:
+        # One session for the whole run: style, key bindings and input
+        # history are set up once, not per command.
+        session = PromptSession(style=style)
+
+        while True:
+            try:
+                command_line = session.prompt(
+                    get_prompt_text,
+                    pre_run=start_background_tasks
+                ).strip()
+            except (KeyboardInterrupt, EOFError):
+                tracker.handle_exit()
+                break
+
+            if not command_line:
+                # ENTER with no command => increment by 1
+                tracker.increment_current_task(1)
                 continue
-            target = args[0]
-            if target.isdigit():
-                # Remove work session by ID
-                session_id = int(target)
-                tracker.remove_session_by_id(session_id)
-            else:
-                console.print("[red]Invalid argument. 'rm' command only accepts work session IDs (numbers).[/]")
+
+            parts = command_line.split()
+            cmd = parts[0].lower()
+            args = parts[1:]
+
+            # If the entire command is a number => increment
+            if cmd.isdigit():
+                n = int(cmd)
+                tracker.increment_current_task(n)
                 continue
 
-        elif cmd in ("rst", "reset"):
-                tracker.reset_current_session()
+            if cmd in ("exit", "quit"):
+                tracker.handle_exit()
+                break
 
-        else:
-            console.print(f"[red]Unknown command:[/] {cmd} (try 'help')")
+            handler = _DISPATCH.get(cmd)
+            if handler is None:
+                console.print(f"[red]Unknown command:[/] {cmd} (try 'help')")
+                continue
+            handler(tracker, args)
 
 
 if __name__ == "__main__":
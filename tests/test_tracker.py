@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import TaskTracker  # noqa: E402
+
+
+class FlushPendingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "tasks.db")
+        self.tracker = TaskTracker(self.db_path)
+        # Fail fast instead of waiting out sqlite3's default 5 s timeout.
+        self.tracker.conn.execute("PRAGMA busy_timeout = 50")
+        self.tracker.set_task_price("writing", 2.0)
+
+    def tearDown(self):
+        self.tracker.close()
+        self.tmpdir.cleanup()
+
+    def queue_sessions(self, n):
+        for _ in range(n):
+            self.tracker.start_session_for_task("writing")
+            self.tracker.finalize_session(count=1)
+
+    def test_locked_flush_keeps_queued_sessions(self):
+        self.queue_sessions(3)
+        self.assertEqual(len(self.tracker._pending_sessions), 3)
+
+        other = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            other.execute("BEGIN IMMEDIATE")
+            with self.assertRaises(sqlite3.OperationalError):
+                self.tracker.flush_pending()
+            self.assertEqual(len(self.tracker._pending_sessions), 3)
+            other.execute("ROLLBACK")
+        finally:
+            other.close()
+
+        self.tracker.flush_pending()
+        self.assertEqual(self.tracker._pending_sessions, [])
+        count = self.tracker.conn.execute("SELECT COUNT(*) FROM work_sessions").fetchone()[0]
+        self.assertEqual(count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()